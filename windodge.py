@@ -9,6 +9,10 @@ import time
 import sys
 import math
 import argparse
+import os
+import json
+import threading
+import collections
 from ctypes import wintypes
 from ctypes import CFUNCTYPE
 
@@ -85,13 +89,25 @@ dwmapi.DwmGetWindowAttribute.argtypes = [wintypes.HWND, wintypes.DWORD, ctypes.P
 
 
 # Window Text/Class functions
-user32.GetWindowTextLengthW.restype = ctypes.c_int
-user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
 user32.GetWindowTextW.restype = ctypes.c_int
 user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
 user32.GetClassNameW.restype = ctypes.c_int
 user32.GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
 
+# Responsiveness checks (hung window isolation)
+user32.IsHungAppWindow.restype = wintypes.BOOL
+user32.IsHungAppWindow.argtypes = [wintypes.HWND]
+user32.SendMessageTimeoutW.restype = wintypes.LPARAM
+user32.SendMessageTimeoutW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM, wintypes.UINT, wintypes.UINT, ctypes.POINTER(ctypes.c_size_t)]
+
+# Extended styles and layered window attributes (fade dodge mode)
+user32.GetWindowLongW.restype = wintypes.LONG
+user32.GetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int]
+user32.SetWindowLongW.restype = wintypes.LONG
+user32.SetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int, wintypes.LONG]
+user32.SetLayeredWindowAttributes.restype = wintypes.BOOL
+user32.SetLayeredWindowAttributes.argtypes = [wintypes.HWND, wintypes.DWORD, ctypes.c_ubyte, wintypes.DWORD]
+
 # Hook functions
 user32.SetWindowsHookExW.restype = wintypes.HHOOK
 user32.SetWindowsHookExW.argtypes = [ctypes.c_int, CFUNCTYPE(ctypes.c_int, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM), wintypes.HINSTANCE, wintypes.DWORD]
@@ -107,6 +123,48 @@ user32.DispatchMessageW.restype = wintypes.LPARAM
 user32.DispatchMessageW.argtypes = [ctypes.POINTER(MSG)]
 user32.PostQuitMessage.restype = None
 user32.PostQuitMessage.argtypes = [ctypes.c_int]
+user32.PeekMessageW.restype = wintypes.BOOL
+user32.PeekMessageW.argtypes = [ctypes.POINTER(MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT, wintypes.UINT]
+
+# Window geometry change notifications (hit-test index refresh)
+WINEVENTPROC = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+user32.SetWinEventHook.restype = wintypes.HANDLE
+user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WINEVENTPROC, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+user32.UnhookWinEvent.restype = wintypes.BOOL
+user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+
+# Power source and battery saver state (power-aware profiles)
+class SYSTEM_POWER_STATUS(ctypes.Structure):
+    _fields_ = [
+        ("ACLineStatus", ctypes.c_ubyte),
+        ("BatteryFlag", ctypes.c_ubyte),
+        ("BatteryLifePercent", ctypes.c_ubyte),
+        ("SystemStatusFlag", ctypes.c_ubyte),
+        ("BatteryLifeTime", wintypes.DWORD),
+        ("BatteryFullLifeTime", wintypes.DWORD)
+    ]
+
+kernel32.GetSystemPowerStatus.restype = wintypes.BOOL
+kernel32.GetSystemPowerStatus.argtypes = [ctypes.POINTER(SYSTEM_POWER_STATUS)]
+
+# Window enumeration and owning process (session resume)
+WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+user32.EnumWindows.restype = wintypes.BOOL
+user32.EnumWindows.argtypes = [WNDENUMPROC, wintypes.LPARAM]
+user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+
+kernel32.OpenProcess.restype = wintypes.HANDLE
+kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+kernel32.QueryFullProcessImageNameW.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+kernel32.CloseHandle.restype = wintypes.BOOL
+kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+# Console close notification (restore faded windows when the console is closed)
+HANDLER_ROUTINE = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.DWORD)
+kernel32.SetConsoleCtrlHandler.restype = wintypes.BOOL
+kernel32.SetConsoleCtrlHandler.argtypes = [HANDLER_ROUTINE, wintypes.BOOL]
 
 kernel32.GetModuleHandleW.restype = wintypes.HMODULE
 kernel32.GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
@@ -133,15 +191,65 @@ GA_ROOT = 2
 
 SW_MINIMIZE = 6
 
+WM_NULL = 0x0000
+SMTO_ABORTIFHUNG = 0x0002
+PM_REMOVE = 0x0001
+
+EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+
+GWL_EXSTYLE = -20
+WS_EX_TRANSPARENT = 0x00000020
+WS_EX_LAYERED = 0x00080000
+LWA_ALPHA = 0x00000002
+
+CTRL_CLOSE_EVENT = 2
+CTRL_LOGOFF_EVENT = 5
+CTRL_SHUTDOWN_EVENT = 6
+
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
 # --- GLOBAL CONFIGURATION VARIABLES (will be set by argparse) ---
 WINDOW_SCREEN_FRACTION = 0.25
 CORNER_GAP_PIXELS = 20
 ANIMATION_DURATION_SECONDS = 0.25
 ANIMATION_FPS = 60
+ANIMATION_MIN_FPS = 15 # Adaptive animation bounds: heavy windows get fewer frames, light ones more
+ANIMATION_MAX_FPS = 120
+ANIMATION_FRAME_BUDGET = 0.5 # Fraction of each frame interval a window's SetWindowPos may consume
+ADAPTIVE_ANIMATION = True
+MOVE_COST_SMOOTHING = 0.3 # Weight of the newest measurement in a window's rolling move cost
+ANIMATION_MIN_EASED_FRAMES = 8 # Below this many frames, even steps look smoother than ease-out
 VALID_INTERNAL_CORNERS = []
 NO_RESIZE = False
 NUM_WINDOWS_TO_CONTROL = 1
 SCREEN_COVERAGE_THRESHOLD = 0.90
+HOVER_MARGIN_PIXELS = 0
+DODGE_MODE = 'move' # 'move' dodges to another corner, 'fade' turns the window translucent and click-through
+FADE_OPACITY = 0.25
+FADE_LINGER_SECONDS = 0.0 # In fade mode, move anyway if the cursor stays this long (0 = never)
+HIT_GRID_CELL_PIXELS = 128 # Cell size of the coarse screen grid used for cursor hit-testing
+POWER_AWARE = False
+POWER_CHECK_INTERVAL_SECONDS = 5.0
+# Runtime profiles picked from the power state. 'max_fps' caps the animation frame rate (None = no cap),
+# 'poll_interval'/'pause_interval' are the loop sleeps while dodging/paused, and 'reassert_topmost'
+# controls whether always-on-top is re-applied every tick (windows are still set topmost on every move).
+POWER_PROFILES = {
+    'ac': {'max_fps': None, 'poll_interval': 0.02, 'pause_interval': 0.5, 'reassert_topmost': True},
+    'battery': {'max_fps': 30, 'poll_interval': 0.05, 'pause_interval': 1.0, 'reassert_topmost': False},
+    'saver': {'max_fps': 20, 'poll_interval': 0.1, 'pause_interval': 2.0, 'reassert_topmost': False}
+}
+HUNG_WINDOW_TIMEOUT_MS = 100 # A window that doesn't answer WM_NULL within this is treated as hung
+HUNG_MOVE_GRACE_SECONDS = 0.5 # Extra time a move may take beyond its animation before its window is quarantined
+QUARANTINE_RECHECK_SECONDS = 1.0
+WINDOW_CALL_TIMEOUT_SECONDS = 0.25 # A style change that takes longer than this quarantines its window
+RELEASE_TIMEOUT_SECONDS = 1.0 # Longest exit waits for windows to be restored from fade
+LOOP_STOP_TIMEOUT_SECONDS = 1.0 # Longest the console close handler waits for the dodge loop to stop
+DODGE_COOLDOWN_SECONDS = 0.2 # A window that just dodged isn't dodged again for this long
+SESSION_FILE = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'windodge', 'session.json')
+SESSION_VERSION = 1
+SESSION_SAVE_DELAY_SECONDS = 1.0 # Session changes within this long of each other are coalesced into one write
 
 # Map mathematical quadrants (user input) to internal corner indices (Windows API)
 # Internal Corner Indices: 0=Top-Left, 1=Top-Right, 2=Bottom-Right, 3=Bottom-Left
@@ -158,12 +266,96 @@ INTERNAL_CORNER_TO_MATH_QUAD_NAME = {
     3: "Bottom-Left (Q3)"
 }
 
+# --- Logging ---
+LOG_DEBUG, LOG_INFO, LOG_WARNING, LOG_ERROR = 10, 20, 30, 40
+LOG_LEVEL_NAMES = {LOG_DEBUG: "DEBUG", LOG_INFO: "INFO", LOG_WARNING: "WARNING", LOG_ERROR: "ERROR"}
+LOG_BUFFER_SIZE = 1000 # Oldest messages are dropped if the writer falls this far behind
+
+class BufferedLogger:
+    """
+    Leveled logger whose callers only append to an in-memory ring buffer.
+    A background thread drains the buffer to the console (and optionally a file),
+    so a slow or blocked console never stalls the dodge loop or the mouse hook.
+    """
+    def __init__(self, level=LOG_INFO, buffer_size=LOG_BUFFER_SIZE):
+        self.level = level
+        self.dropped = 0
+        self._buffer = collections.deque(maxlen=buffer_size)
+        self._pending = threading.Event()
+        self._closed = False
+        self._log_file = None
+        self._writer = None
+
+    def start(self, log_file_path=None):
+        """Starts the background writer, optionally also appending to `log_file_path`."""
+        if log_file_path:
+            self._log_file = open(log_file_path, 'a', encoding='utf-8')
+        self._writer = threading.Thread(target=self._write_forever, name="windodge-log-writer", daemon=True)
+        self._writer.start()
+
+    def log(self, level, message):
+        if level < self.level: return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append((time.time(), level, message))
+        self._pending.set()
+
+    def debug(self, message): self.log(LOG_DEBUG, message)
+    def info(self, message): self.log(LOG_INFO, message)
+    def warning(self, message): self.log(LOG_WARNING, message)
+    def error(self, message): self.log(LOG_ERROR, message)
+
+    def close(self, timeout=1.0):
+        """Stops the writer after it has flushed the buffer, waiting at most `timeout` seconds."""
+        if self.dropped:
+            self.warning(f"{self.dropped} log messages were dropped because output could not keep up.")
+        self._closed = True
+        self._pending.set()
+        if self._writer:
+            self._writer.join(timeout)
+        else:
+            self._drain() # Never started (e.g. argument errors): write synchronously
+
+    def _drain(self):
+        while True:
+            try:
+                timestamp, level, message = self._buffer.popleft()
+            except IndexError:
+                break
+            sys.stdout.write(message + "\n")
+            if self._log_file:
+                self._log_file.write(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))} {LOG_LEVEL_NAMES[level]:<7} {message.strip()}\n")
+        sys.stdout.flush()
+        if self._log_file: self._log_file.flush()
+
+    def _write_forever(self):
+        while not self._closed:
+            self._pending.wait()
+            self._pending.clear()
+            self._drain()
+        self._drain() # Anything logged between the last drain and close()
+        if self._log_file: self._log_file.close()
+
+log = BufferedLogger()
+
 # Global variables for hook management
 g_hook_id = None
 g_selected_hwnds = []
 
+# Animation frame rates configured on the command line, before any power profile cap: (fps, min_fps, max_fps)
+g_base_animation_fps = (ANIMATION_FPS, ANIMATION_MIN_FPS, ANIMATION_MAX_FPS)
+
+# Keeps the console control handler's ctypes callback alive for the lifetime of the process
+g_console_ctrl_handler = None
+
+# Number of times a window has been quarantined for not responding
+g_quarantine_events = 0
+
 # Global flag for DWM availability - will be checked once at startup
 G_DWM_AVAILABLE = True 
+# DWM availability as probed at startup (or taken from a resumed session). Unlike G_DWM_AVAILABLE it isn't
+# lowered by a single failed query at runtime, so it is what gets saved with the session.
+G_DWM_STARTUP_AVAILABLE = True
 
 # --- Mouse Hook Callback ---
 @CFUNCTYPE(ctypes.c_int, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
@@ -179,16 +371,16 @@ def mouse_hook_proc(nCode, wParam, lParam):
             console_hwnd = kernel32.GetConsoleWindow()
             if top_level_hwnd != console_hwnd and top_level_hwnd not in g_selected_hwnds:
                 g_selected_hwnds.append(top_level_hwnd)
-                print(f"Selected window {len(g_selected_hwnds)}/{NUM_WINDOWS_TO_CONTROL}: {top_level_hwnd}")
+                log.info(f"Selected window {len(g_selected_hwnds)}/{NUM_WINDOWS_TO_CONTROL}: {top_level_hwnd}")
                 if len(g_selected_hwnds) == NUM_WINDOWS_TO_CONTROL:
                     user32.PostQuitMessage(0)
                 return 1
             elif top_level_hwnd == console_hwnd:
-                print("Clicked on console. Please click another window.")
+                log.info("Clicked on console. Please click another window.")
             elif top_level_hwnd in g_selected_hwnds:
-                print("This window is already selected. Please choose a different one.")
+                log.info("This window is already selected. Please choose a different one.")
         else:
-            print("No visible top-level window found at cursor position, or clicked on an invalid area.")
+            log.info("No visible top-level window found at cursor position, or clicked on an invalid area.")
     return user32.CallNextHookEx(g_hook_id, nCode, wParam, lParam)
 
 # --- Utility Functions ---
@@ -227,7 +419,7 @@ def get_window_visual_rect(hwnd, retries=5, delay=0.01):
         time.sleep(delay)
     # If DWM call fails after retries, set global flag and fall back
     G_DWM_AVAILABLE = False
-    print(f"Warning: DwmGetWindowAttribute failed for {hwnd} after retries. Falling back to GetWindowRect for visual estimation. Visual positioning might be less precise.")
+    log.warning(f"DwmGetWindowAttribute failed for {hwnd} after retries. Falling back to GetWindowRect for visual estimation. Visual positioning might be less precise.")
     return get_window_rect(hwnd, retries=1) # Only one retry for fallback
 
 def get_window_frame_paddings(hwnd):
@@ -251,34 +443,140 @@ def get_window_frame_paddings(hwnd):
     return pad_l, pad_t, pad_r, pad_b
 
 def get_window_info(hwnd):
-    length = user32.GetWindowTextLengthW(hwnd)
-    buff = ctypes.create_unicode_buffer(length + 1)
-    user32.GetWindowTextW(hwnd, buff, length + 1)
-    title = buff.value if length > 0 else "N/A"
+    # GetWindowTextW reads another process's caption without messaging it (GetWindowTextLengthW would),
+    # so a hung window can't block this call.
+    buff = ctypes.create_unicode_buffer(512)
+    user32.GetWindowTextW(hwnd, buff, 512)
+    title = buff.value if buff.value else "N/A"
 
     c_buff = ctypes.create_unicode_buffer(256)
     user32.GetClassNameW(hwnd, c_buff, 256)
     class_name = c_buff.value if c_buff.value else "N/A"
     return title, class_name
 
-def is_mouse_in_window(hwnd, current_visual_rect):
-    """Checks if the mouse cursor is within the VISUAL boundaries of the given window."""
-    if not user32.IsWindow(hwnd) or not user32.IsWindowVisible(hwnd): return False
-    mouse_pos = POINT()
-    if not user32.GetCursorPos(ctypes.byref(mouse_pos)): return False
-    
-    rect = current_visual_rect # Use the provided visual rect
-    if not rect: return False
-    return rect.left <= mouse_pos.x < rect.right and rect.top <= mouse_pos.y < rect.bottom
+def get_window_process_id(hwnd):
+    """Returns the id of the process owning the window."""
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    return pid.value
+
+def get_window_process_name(hwnd):
+    """Returns the executable name (e.g. 'vlc.exe') of the process owning the window, or "N/A"."""
+    h_process = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, get_window_process_id(hwnd))
+    if not h_process: return "N/A"
+    try:
+        buff = ctypes.create_unicode_buffer(1024)
+        size = wintypes.DWORD(len(buff))
+        if not kernel32.QueryFullProcessImageNameW(h_process, 0, buff, ctypes.byref(size)): return "N/A"
+        return os.path.basename(buff.value).lower()
+    finally:
+        kernel32.CloseHandle(h_process)
+
+def get_window_identity(hwnd):
+    """Returns the (process, class, title) identity used to find a window again across restarts."""
+    title, class_name = get_window_info(hwnd)
+    return {'process': get_window_process_name(hwnd), 'class': class_name, 'title': title}
+
+class GeometryWatcher:
+    """
+    Tracks which controlled windows moved or resized, so the dodge loop only re-reads the
+    visual rects (a DWM query each) of windows that actually changed.
+    Listens for EVENT_OBJECT_LOCATIONCHANGE from the windows' processes; the events are
+    delivered while pending messages are pumped, so it must be created and used on the loop's thread.
+    If a hook can't be installed, every window counts as changed on every tick (plain polling).
+    """
+    def __init__(self, hwnds):
+        self._hwnds = set(hwnds)
+        self._changed = set(hwnds) # Everything is read once at the start
+        self._callback = WINEVENTPROC(self._on_event) # Kept alive for as long as the hooks are installed
+        self._hooks = []
+        self.polling = False
+        for pid in {get_window_process_id(hwnd) for hwnd in hwnds}:
+            hook = user32.SetWinEventHook(EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_LOCATIONCHANGE, None, self._callback, pid, 0, WINEVENT_OUTOFCONTEXT)
+            if not hook:
+                self.polling = True
+                log.warning("Could not watch window geometry changes. Window positions will be polled every tick.")
+                break
+            self._hooks.append(hook)
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        if id_object == OBJID_WINDOW and hwnd in self._hwnds:
+            self._changed.add(hwnd)
+
+    def take_changed(self):
+        """Returns the hwnds whose geometry changed since the last call."""
+        if self.polling: return set(self._hwnds)
+        msg = MSG()
+        while user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_REMOVE): # Delivers queued WinEvents to _on_event
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def close(self):
+        for hook in self._hooks:
+            user32.UnhookWinEvent(hook)
+        self._hooks = []
+
+def get_windows_geometry(all_windows_states):
+    """
+    Returns a hashable snapshot of every dodgeable window's visual rect, used to detect geometry changes.
+    Quarantined windows are left out, so quarantining or releasing one also counts as a change.
+    """
+    geometry = []
+    for window_state in all_windows_states:
+        rect = window_state.get('current_visual_rect')
+        if rect and window_state.get('quarantined_since') is None:
+            geometry.append((window_state['hwnd'], rect.left, rect.top, rect.right, rect.bottom))
+    return tuple(geometry)
 
-def is_window_too_large(hwnd, screen_w, screen_h, threshold):
+def build_danger_zone_index(all_windows_states, margin, cell_size=HIT_GRID_CELL_PIXELS):
+    """
+    Builds a coarse screen grid of "danger zones" (visual rects padded by `margin`).
+    Each grid cell maps to the window states whose zone touches it, so a cursor sample
+    resolves to its candidate windows with a single dictionary lookup.
+    Only needs rebuilding when window geometry changes.
+    """
+    cells = {}
+    bounds = None # Union of all zones, lets "cursor in empty space" bail out with four compares
+    for window_state in all_windows_states:
+        rect = window_state.get('current_visual_rect')
+        if not rect or window_state.get('quarantined_since') is not None: continue
+        zone = (rect.left - margin, rect.top - margin, rect.right + margin, rect.bottom + margin)
+        if bounds is None:
+            bounds = zone
+        else:
+            bounds = (min(bounds[0], zone[0]), min(bounds[1], zone[1]), max(bounds[2], zone[2]), max(bounds[3], zone[3]))
+        for cell_x in range(zone[0] // cell_size, (zone[2] - 1) // cell_size + 1):
+            for cell_y in range(zone[1] // cell_size, (zone[3] - 1) // cell_size + 1):
+                cells.setdefault((cell_x, cell_y), []).append((zone, window_state))
+    return {
+        'geometry': get_windows_geometry(all_windows_states),
+        'cell_size': cell_size,
+        'bounds': bounds,
+        'cells': cells
+    }
+
+def hit_test_danger_zones(index, x, y):
+    """Returns the window states whose danger zone contains the point (x, y), in control order."""
+    bounds = index['bounds']
+    if not bounds or not (bounds[0] <= x < bounds[2] and bounds[1] <= y < bounds[3]):
+        return [] # Common case: cursor is in empty space
+    cell_size = index['cell_size']
+    candidates = index['cells'].get((x // cell_size, y // cell_size))
+    if not candidates: return []
+    return [window_state for zone, window_state in candidates
+            if zone[0] <= x < zone[2] and zone[1] <= y < zone[3]]
+
+def is_window_too_large(hwnd, screen_w, screen_h, threshold, visual_rect=None):
     """
     Checks if a window is maximized or covers more than the specified threshold
     percentage of the screen area. Uses visual rect for accurate area check.
+    An already fetched `visual_rect` can be passed to avoid querying DWM again.
     """
     if user32.IsZoomed(hwnd): return True
     
-    rect = get_window_visual_rect(hwnd)
+    rect = visual_rect or get_window_visual_rect(hwnd)
     if not rect: return False
 
     window_area = rect.width() * rect.height()
@@ -319,12 +617,12 @@ def do_rects_overlap(rect1, rect2, tolerance=0):
 
 def is_overlapping_any_other_window(check_visual_rect, all_windows_states, current_window_hwnd, tolerance=0):
     """
-    Checks if check_visual_rect overlaps with any other window's current_visual_rect
-    in all_windows_states, excluding the current_window_hwnd itself.
+    Checks if check_visual_rect overlaps with any other window's current_visual_rect (or the
+    target_visual_rect of a window still moving) in all_windows_states, excluding the current_window_hwnd itself.
     """
     for window_state in all_windows_states:
         if window_state['hwnd'] == current_window_hwnd: continue
-        other_rect = window_state.get('current_visual_rect')
+        other_rect = window_state.get('target_visual_rect') or window_state.get('current_visual_rect')
         if other_rect and do_rects_overlap(check_visual_rect, other_rect, tolerance):
             return True
     return False
@@ -405,13 +703,258 @@ def get_safe_target_corner(current_corner_index, ideal_corner_index, all_windows
     # If no safe and allowed corner is found, return the current corner (stay put)
     return current_corner_index
 
+def is_window_responsive(hwnd):
+    """Returns False if the window's thread is hung or doesn't process a message within HUNG_WINDOW_TIMEOUT_MS."""
+    if user32.IsHungAppWindow(hwnd): return False
+    result = ctypes.c_size_t()
+    return bool(user32.SendMessageTimeoutW(hwnd, WM_NULL, 0, 0, SMTO_ABORTIFHUNG, HUNG_WINDOW_TIMEOUT_MS, ctypes.byref(result)))
+
+def quarantine_window(window_state, reason):
+    """Stops dodging (and all blocking calls into) a window until it responds again."""
+    global g_quarantine_events
+    g_quarantine_events += 1
+    window_state['quarantined_since'] = time.perf_counter()
+    window_state['last_quarantine_check'] = window_state['quarantined_since']
+    log.warning(f"Window {window_state['hwnd']} is not responding ({reason}). Quarantined until it responds again ({g_quarantine_events} quarantine events so far).")
+
+def check_quarantine(window_state):
+    """
+    Re-probes a quarantined window at most every QUARANTINE_RECHECK_SECONDS.
+    The probe runs on the window's worker; poll_window_worker releases the window once it answers.
+    """
+    now = time.perf_counter()
+    if now - window_state['last_quarantine_check'] < QUARANTINE_RECHECK_SECONDS: return
+    window_state['last_quarantine_check'] = now
+    if is_window_busy(window_state): return # An earlier call (or probe) is still stuck inside the window
+    dispatch_window_call(window_state, 'probe', QUARANTINE_RECHECK_SECONDS, is_window_responsive, window_state['hwnd'])
+
+def is_window_busy(window_state):
+    """Returns True while a call dispatched to the window is still running."""
+    worker = window_state['worker']
+    return worker is not None and worker.is_alive()
+
+def dispatch_window_call(window_state, action, timeout, call, *args, **kwargs):
+    """
+    Starts `call` for one window on its own worker thread and returns without waiting for it.
+    Anything that messages the window's thread (moves, style changes) goes through here, so a
+    window that hangs can only block its daemon worker, never the dodge loop. poll_window_worker
+    collects the result and quarantines the window if the call is still running after `timeout` seconds.
+    """
+    result = {}
+
+    def run_call():
+        result['value'] = call(*args, **kwargs)
+
+    worker = threading.Thread(target=run_call, name=f"windodge-{action}-{window_state['hwnd']}", daemon=True)
+    window_state['worker'] = worker
+    window_state['worker_action'] = action
+    window_state['worker_deadline'] = time.perf_counter() + timeout
+    window_state['worker_result'] = result
+    worker.start()
+
+def poll_window_worker(window_state):
+    """
+    Checks the window's pending call once per tick. Quarantines the window when the call runs past
+    its deadline, and applies the call's outcome to the window's state once it has finished.
+    Returns the finished call's action, or None if nothing finished.
+    """
+    worker = window_state['worker']
+    if worker is None: return None
+    action = window_state['worker_action']
+    if worker.is_alive():
+        if window_state['quarantined_since'] is None and time.perf_counter() > window_state['worker_deadline']:
+            quarantine_window(window_state, f"{action} timed out")
+        return None
+
+    window_state['worker'] = None
+    value = window_state['worker_result'].get('value')
+    if action == 'move':
+        update_move_cost(window_state, value)
+        window_state['faded_since'] = None # A lingering fade is undone before the move
+        window_state['target_visual_rect'] = None
+        window_state['dodge_cooldown_until'] = time.perf_counter() + DODGE_COOLDOWN_SECONDS
+    elif action == 'unfade':
+        window_state['faded_since'] = None
+    elif action == 'probe' and value and window_state['quarantined_since'] is not None:
+        window_state['quarantined_since'] = None
+        log.info(f"Window {window_state['hwnd']} is responding again. Dodging resumed.")
+    return action
+
+def wait_for_window_workers(all_windows_states, deadline):
+    """Waits for the windows' pending calls until the perf_counter `deadline` at the latest."""
+    for window_state in all_windows_states:
+        worker = window_state['worker']
+        if worker is not None:
+            worker.join(max(0.0, deadline - time.perf_counter()))
+
+def can_fade_window(hwnd):
+    """
+    Windows that are already layered (colour-key windows, or ones drawn with UpdateLayeredWindow)
+    can't be faded and restored reliably, so they are moved instead.
+    """
+    return not user32.GetWindowLongW(hwnd, GWL_EXSTYLE) & WS_EX_LAYERED
+
+def apply_fade(hwnd, ex_style):
+    """Makes the window layered, click-through and translucent. Runs on the window's worker."""
+    user32.SetWindowLongW(hwnd, GWL_EXSTYLE, ex_style | WS_EX_LAYERED | WS_EX_TRANSPARENT)
+    user32.SetLayeredWindowAttributes(hwnd, 0, int(255 * FADE_OPACITY), LWA_ALPHA)
+
+def fade_window(window_state):
+    """
+    Makes the window translucent and click-through, remembering its original extended style.
+    The style change is dispatched to the window's worker. Returns False without touching
+    the window if it is hung.
+    """
+    hwnd = window_state['hwnd']
+    if user32.IsHungAppWindow(hwnd): return False
+    ex_style = user32.GetWindowLongW(hwnd, GWL_EXSTYLE) # Reads a cached value, doesn't message the window
+    window_state['original_ex_style'] = ex_style
+    window_state['faded_since'] = time.perf_counter()
+    dispatch_window_call(window_state, 'fade', WINDOW_CALL_TIMEOUT_SECONDS, apply_fade, hwnd, ex_style)
+    return True
+
+def unfade_window(window_state):
+    """
+    Restores a faded window's original extended style on the window's worker, which also drops
+    the fade alpha (only windows that weren't layered are ever faded). The window counts as faded
+    until the call completes. Does nothing if it isn't faded.
+    Returns False if the window is faded but hung, leaving it faded.
+    """
+    if window_state['faded_since'] is None: return True
+    hwnd = window_state['hwnd']
+    if user32.IsHungAppWindow(hwnd): return False
+    dispatch_window_call(window_state, 'unfade', WINDOW_CALL_TIMEOUT_SECONDS, user32.SetWindowLongW, hwnd, GWL_EXSTYLE, window_state['original_ex_style'])
+    return True
+
+def release_windows(all_windows_states):
+    """
+    Undoes everything windodge applied to its windows: the fade and always-on-top.
+    Waits at most RELEASE_TIMEOUT_SECONDS in total, so a hung window can't block exit.
+    """
+    deadline = time.perf_counter() + RELEASE_TIMEOUT_SECONDS
+    live_windows = [window_state for window_state in all_windows_states if user32.IsWindow(window_state['hwnd'])]
+
+    # Let in-flight moves and style changes finish first, then restore fades through the same workers
+    wait_for_window_workers(live_windows, deadline)
+    for window_state in live_windows:
+        poll_window_worker(window_state)
+        if not is_window_busy(window_state): unfade_window(window_state)
+    wait_for_window_workers(live_windows, deadline)
+
+    for window_state in live_windows:
+        poll_window_worker(window_state)
+        if window_state['faded_since'] is not None:
+            log.warning(f"Window {window_state['hwnd']} is not responding and could not be restored from fade.")
+        # Asynchronous so a hung window can't block exit
+        user32.SetWindowPos(window_state['hwnd'], HWND_NOTOPMOST, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE | SWP_SHOWWINDOW | SWP_ASYNCWINDOWPOS)
+        log.info(f"Always on top status removed from window {window_state['hwnd']}.")
+
+def install_console_close_handler(on_close):
+    """
+    Calls `on_close` when the console is closed or the user logs off or shuts down.
+    Those kill the process without running `finally` blocks. Ctrl+C is left to Python (KeyboardInterrupt).
+    """
+    global g_console_ctrl_handler
+
+    def handle_console_event(ctrl_type):
+        if ctrl_type not in (CTRL_CLOSE_EVENT, CTRL_LOGOFF_EVENT, CTRL_SHUTDOWN_EVENT): return False
+        on_close()
+        return True
+
+    g_console_ctrl_handler = HANDLER_ROUTINE(handle_console_event)
+    if not kernel32.SetConsoleCtrlHandler(g_console_ctrl_handler, True):
+        log.warning("Could not install console close handler. Faded windows may stay faded if the console is closed.")
+
+def restore_and_move_window(hwnd, restore_ex_style, *move_args, **move_kwargs):
+    """
+    Restores `restore_ex_style` first when given (undoing a lingering fade), then calls move_window.
+    Runs on the window's worker.
+    """
+    if restore_ex_style is not None:
+        user32.SetWindowLongW(hwnd, GWL_EXSTYLE, restore_ex_style)
+    return move_window(hwnd, *move_args, **move_kwargs)
+
+def dodge_to_safe_corner(window_state, mouse_x, mouse_y, all_windows_states, screen_w, screen_h):
+    """
+    Starts moving the window to the safe corner away from the mouse on the window's worker.
+    Returns True if a move was dispatched, False if no better corner was available or the
+    window was quarantined as hung. A faded window is restored before it moves.
+    """
+    hwnd = window_state['hwnd']
+    ideal_corner_index = get_ideal_directional_corner(window_state['corner'], mouse_x, mouse_y, window_state['current_visual_rect'])
+    
+    # Find a safe target corner (non-overlapping and allowed)
+    target_corner_index = get_safe_target_corner(
+        window_state['corner'],
+        ideal_corner_index,
+        all_windows_states,
+        hwnd,
+        screen_w, screen_h,
+        window_state['vis_w'],
+        window_state['vis_h'],
+        CORNER_GAP_PIXELS
+    )
+    if target_corner_index == window_state['corner']: return False
+    if user32.IsHungAppWindow(hwnd):
+        quarantine_window(window_state, "before move")
+        return False
+
+    log.info(f"Window {hwnd} moving from {INTERNAL_CORNER_TO_MATH_QUAD_NAME[window_state['corner']]} to {INTERNAL_CORNER_TO_MATH_QUAD_NAME[target_corner_index]}.")
+    window_state['corner'] = target_corner_index
+
+    target_vis_x, target_vis_y = get_target_visual_coordinates(target_corner_index, screen_w, screen_h, window_state['vis_w'], window_state['vis_h'], CORNER_GAP_PIXELS)
+    # Other windows pick their corners against where this one is going, not where it is mid-animation
+    window_state['target_visual_rect'] = RECT(target_vis_x, target_vis_y, target_vis_x + window_state['vis_w'], target_vis_y + window_state['vis_h'])
+    restore_ex_style = window_state['original_ex_style'] if window_state['faded_since'] is not None else None
+
+    dispatch_window_call(
+        window_state, 'move', ANIMATION_DURATION_SECONDS + HUNG_MOVE_GRACE_SECONDS,
+        restore_and_move_window, hwnd, restore_ex_style,
+        target_vis_x, target_vis_y, window_state['vis_w'], window_state['vis_h'], window_state['frame_paddings'],
+        animate=True, always_on_top=True, move_cost=window_state['move_cost']
+    )
+    return True
+
 def ease_out_quad(t): return t * (2 - t)
 
-def move_window(hwnd, target_vis_x, target_vis_y, target_vis_w, target_vis_h, frame_paddings, animate=False, always_on_top=False):
+def ease_linear(t): return t
+
+def get_animation_plan(move_cost):
+    """
+    Returns (total_frames, easing) for an animated move, given a window's rolling per-frame
+    move cost in seconds (None if not measured yet). The wall-clock duration stays fixed;
+    the frame rate is picked so each frame's SetWindowPos fits in ANIMATION_FRAME_BUDGET of
+    the frame interval, bounded by ANIMATION_MIN_FPS..ANIMATION_MAX_FPS.
+    Windows too expensive to reach ANIMATION_MIN_FPS get 0 frames (an instant move).
+    """
+    if not ADAPTIVE_ANIMATION or move_cost is None:
+        return int(ANIMATION_DURATION_SECONDS * ANIMATION_FPS), ease_out_quad
+
+    affordable_fps = ANIMATION_FRAME_BUDGET / move_cost if move_cost > 0 else ANIMATION_MAX_FPS
+    if affordable_fps < ANIMATION_MIN_FPS:
+        return 0, ease_linear
+
+    fps = min(affordable_fps, ANIMATION_MAX_FPS)
+    total_frames = int(ANIMATION_DURATION_SECONDS * fps)
+    easing = ease_out_quad if total_frames >= ANIMATION_MIN_EASED_FRAMES else ease_linear
+    return total_frames, easing
+
+def update_move_cost(window_state, measured_cost):
+    """Blends a new per-frame move cost measurement into the window's rolling estimate."""
+    if measured_cost is None: return
+    previous_cost = window_state.get('move_cost')
+    if previous_cost is None:
+        window_state['move_cost'] = measured_cost
+    else:
+        window_state['move_cost'] = previous_cost + MOVE_COST_SMOOTHING * (measured_cost - previous_cost)
+
+def move_window(hwnd, target_vis_x, target_vis_y, target_vis_w, target_vis_h, frame_paddings, animate=False, always_on_top=False, move_cost=None):
     """
     Moves/resizes the window.
     `target_vis_x, target_vis_y, target_vis_w, target_vis_h` are for the VISUAL rectangle.
     `frame_paddings` are used to convert these to bounding box coordinates for SetWindowPos.
+    When animating, `move_cost` (the window's rolling per-frame cost) sizes the animation, and
+    the measured average per-frame cost of this move is returned (None when not animating).
     """
     pad_l, pad_t, pad_r, pad_b = frame_paddings
     
@@ -426,171 +969,141 @@ def move_window(hwnd, target_vis_x, target_vis_y, target_vis_w, target_vis_h, fr
 
     if not animate:
         user32.SetWindowPos(hwnd, insert, int(target_bounds_x), int(target_bounds_y), int(target_bounds_w), int(target_bounds_h), flags)
-    else:
-        # Animation requires current bounding box position
-        current_bounds_rect = get_window_rect(hwnd)
-        if not current_bounds_rect: # Cannot animate if current bounds are unknown
-            user32.SetWindowPos(hwnd, insert, int(target_bounds_x), int(target_bounds_y), int(target_bounds_w), int(target_bounds_h), flags)
-            return
-            
-        start_bounds_x, start_bounds_y = current_bounds_rect.left, current_bounds_rect.top
-        
-        total_frames = int(ANIMATION_DURATION_SECONDS * ANIMATION_FPS)
-        if total_frames <= 0: # If duration is too short, just instant move
-            user32.SetWindowPos(hwnd, insert, int(target_bounds_x), int(target_bounds_y), int(target_bounds_w), int(target_bounds_h), flags)
-            return
+        return None
 
-        frame_interval = 1.0 / ANIMATION_FPS
-        start_time = time.perf_counter()
+    # During animation, we maintain Z-order to prevent flickering
+    animation_flags = SWP_NOACTIVATE | SWP_NOZORDER | SWP_NOSIZE
 
-        # During animation, we maintain Z-order to prevent flickering
-        animation_flags = SWP_NOACTIVATE | SWP_NOZORDER | SWP_NOSIZE
-        
-        for frame in range(1, total_frames + 1):
-            elapsed = time.perf_counter() - start_time
-            progress = ease_out_quad(min(elapsed / ANIMATION_DURATION_SECONDS, 1.0))
-            
-            cur_bx = start_bounds_x + (target_bounds_x - start_bounds_x) * progress
-            cur_by = start_bounds_y + (target_bounds_y - start_bounds_y) * progress
-            
-            user32.SetWindowPos(hwnd, 0, int(cur_bx), int(cur_by), 0, 0, animation_flags) # 0,0 for size means SWP_NOSIZE is used
-            
-            tgt_time = start_time + frame * frame_interval
-            sleep_time = tgt_time - time.perf_counter()
-            if sleep_time > 0: time.sleep(sleep_time)
-            if progress >= 1.0: break
-            
-        # Final set to ensure exact position and size, applying desired Z-order
+    # Animation requires current bounding box position
+    current_bounds_rect = get_window_rect(hwnd)
+    if not current_bounds_rect: # Cannot animate if current bounds are unknown
         user32.SetWindowPos(hwnd, insert, int(target_bounds_x), int(target_bounds_y), int(target_bounds_w), int(target_bounds_h), flags)
+        return None
 
+    total_frames, easing = get_animation_plan(move_cost)
+    if total_frames <= 0: # Too heavy to animate: jump in a single frame-style move, still sampling its cost
+        frame_start = time.perf_counter()
+        user32.SetWindowPos(hwnd, 0, int(target_bounds_x), int(target_bounds_y), 0, 0, animation_flags)
+        frame_cost = time.perf_counter() - frame_start
+        user32.SetWindowPos(hwnd, insert, int(target_bounds_x), int(target_bounds_y), int(target_bounds_w), int(target_bounds_h), flags)
+        return frame_cost
+        
+    start_bounds_x, start_bounds_y = current_bounds_rect.left, current_bounds_rect.top
 
-# --- Main ---
-def main():
-    global WINDOW_SCREEN_FRACTION, CORNER_GAP_PIXELS, ANIMATION_FPS, VALID_INTERNAL_CORNERS, NO_RESIZE, NUM_WINDOWS_TO_CONTROL, SCREEN_COVERAGE_THRESHOLD
-    global g_hook_id, g_selected_hwnds, G_DWM_AVAILABLE
+    frame_interval = ANIMATION_DURATION_SECONDS / total_frames
+    start_time = time.perf_counter()
+    
+    frames_presented = 0
+    total_frame_cost = 0.0
+    for frame in range(1, total_frames + 1):
+        elapsed = time.perf_counter() - start_time
+        progress = easing(min(elapsed / ANIMATION_DURATION_SECONDS, 1.0))
+        
+        cur_bx = start_bounds_x + (target_bounds_x - start_bounds_x) * progress
+        cur_by = start_bounds_y + (target_bounds_y - start_bounds_y) * progress
+        
+        frame_start = time.perf_counter()
+        user32.SetWindowPos(hwnd, 0, int(cur_bx), int(cur_by), 0, 0, animation_flags) # 0,0 for size means SWP_NOSIZE is used
+        total_frame_cost += time.perf_counter() - frame_start
+        frames_presented += 1
+        
+        tgt_time = start_time + frame * frame_interval
+        sleep_time = tgt_time - time.perf_counter()
+        if sleep_time > 0: time.sleep(sleep_time)
+        if progress >= 1.0: break
+        
+    # Final set to ensure exact position and size, applying desired Z-order
+    user32.SetWindowPos(hwnd, insert, int(target_bounds_x), int(target_bounds_y), int(target_bounds_w), int(target_bounds_h), flags)
+    return total_frame_cost / frames_presented
 
-    parser = argparse.ArgumentParser(
-        description="windodge.py: Makes selected Windows dodge your mouse with smooth animation. Supports up to 4 windows, preventing overlap. Pauses if a window is maximized or too large. Allows windows to overlap taskbar.",
-        formatter_class=argparse.RawTextHelpFormatter
-    )
-    parser.add_argument(
-        '--size',
-        type=float,
-        default=WINDOW_SCREEN_FRACTION,
-        help=(
-            f"Window size as a fraction of screen width/height (e.g., 0.25 for 25%%).\n"
-            f"Aspect ratio of the original window will be preserved.\n"
-            f"This parameter is ignored if --no-resize is used.\n"
-            f"Default: {WINDOW_SCREEN_FRACTION}"
-        )
-    )
-    parser.add_argument(
-        '--fps',
-        type=int,
-        default=ANIMATION_FPS,
-        help=f"Animation frames per second (higher = smoother, more CPU).\nDefault: {ANIMATION_FPS}"
-    )
-    parser.add_argument(
-        '--gap',
-        type=int,
-        default=CORNER_GAP_PIXELS,
-        help=f"Pixel gap between window and screen borders.\nDefault: {CORNER_GAP_PIXELS}"
-    )
-    parser.add_argument(
-        '--positions',
-        type=str,
-        default="1234",
-        help=(
-            "Which corners the window can move to. Specify as a string of numbers 1-4 (no spaces).\n"
-            "   1: Top-Right (Math Q1)\n"
-            "   2: Top-Left (Math Q2)\n"
-            "   3: Bottom-Left (Math Q3)\n"
-            "   4: Bottom-Right (Math Q4)\n"
-            "Example: '12' for Top-Left and Top-Right only.\n"
-            "Default: '1234' (all corners)"
-        )
-    )
-    parser.add_argument(
-        '--no-resize', '-N',
-        action='store_true',
-        help="Do not resize the selected window; only move it. Ignores --size parameter."
-    )
-    parser.add_argument(
-        '--num-windows', '-n',
-        type=int,
-        default=NUM_WINDOWS_TO_CONTROL,
-        choices=range(1, 5), # Limit to 1 to 4 windows
-        help=f"Number of windows to control (1-4). You will click each window to select it.\nDefault: {NUM_WINDOWS_TO_CONTROL}"
-    )
-    parser.add_argument(
-        '--pause-threshold',
-        type=float,
-        default=SCREEN_COVERAGE_THRESHOLD,
-        help=(
-            f"Percentage of screen area (0.0 to 1.0) a window can cover before pausing dodging.\n"
-            f"Also pauses if window is maximized. Default: {SCREEN_COVERAGE_THRESHOLD}"
-        )
-    )
 
-    args = parser.parse_args()
+def get_system_power_state():
+    """Returns (on_battery, battery_saver_on) from GetSystemPowerStatus, or None if it can't be read."""
+    status = SYSTEM_POWER_STATUS()
+    if not kernel32.GetSystemPowerStatus(ctypes.byref(status)): return None
+    # ACLineStatus: 0 = offline, 1 = online, 255 = unknown (treated as AC). SystemStatusFlag: 1 = battery saver on.
+    return status.ACLineStatus == 0, status.SystemStatusFlag == 1
 
-    # Apply arguments to global configuration
-    WINDOW_SCREEN_FRACTION = args.size
-    ANIMATION_FPS = args.fps
-    CORNER_GAP_PIXELS = args.gap
-    NO_RESIZE = args.no_resize
-    NUM_WINDOWS_TO_CONTROL = args.num_windows
-    SCREEN_COVERAGE_THRESHOLD = args.pause_threshold
+def get_power_profile_name(power_state_source=get_system_power_state):
+    """
+    Picks the POWER_PROFILES entry for the current power state. `power_state_source` is any
+    callable returning (on_battery, battery_saver_on) or None, so the switch can be driven without real hardware.
+    """
+    power_state = power_state_source()
+    if power_state is None: return 'ac'
+    on_battery, battery_saver_on = power_state
+    if battery_saver_on: return 'saver'
+    return 'battery' if on_battery else 'ac'
+
+def apply_power_profile(profile_name):
+    """Applies a power profile's frame rate cap to the animation globals. Returns the profile."""
+    global ANIMATION_FPS, ANIMATION_MIN_FPS, ANIMATION_MAX_FPS
+    profile = POWER_PROFILES[profile_name]
+    base_fps, base_min_fps, base_max_fps = g_base_animation_fps
+    max_fps = profile['max_fps']
+    if max_fps is None:
+        ANIMATION_FPS, ANIMATION_MIN_FPS, ANIMATION_MAX_FPS = base_fps, base_min_fps, base_max_fps
+    else:
+        ANIMATION_FPS = min(base_fps, max_fps)
+        ANIMATION_MIN_FPS = min(base_min_fps, max_fps)
+        ANIMATION_MAX_FPS = min(base_max_fps, max_fps)
+    return profile
 
-    # Initial check for DWM functionality
+class PowerProfileMonitor:
+    """
+    Tracks the active power profile at runtime. poll() re-reads `power_state_source` at most every
+    `check_interval` seconds of `clock` and applies a new profile when the power state changes.
+    Both are injectable so profile switching can be driven without real hardware;
+    with no source, the 'ac' profile stays active.
+    """
+    def __init__(self, power_state_source=get_system_power_state, clock=time.perf_counter, check_interval=POWER_CHECK_INTERVAL_SECONDS):
+        self.power_state_source = power_state_source
+        self.clock = clock
+        self.check_interval = check_interval
+        self.profile_name = 'ac'
+        self.profile = apply_power_profile(self.profile_name)
+        self._last_check = None
+
+    def poll(self):
+        """Returns True if the active profile changed."""
+        if self.power_state_source is None: return False
+        now = self.clock()
+        if self._last_check is not None and now - self._last_check < self.check_interval: return False
+        self._last_check = now
+
+        profile_name = get_power_profile_name(self.power_state_source)
+        if profile_name == self.profile_name: return False
+        self.profile_name = profile_name
+        self.profile = apply_power_profile(profile_name)
+        log.info(f"Power state changed: using '{profile_name}' profile ({ANIMATION_MAX_FPS} FPS max, {self.profile['poll_interval']*1000:.0f}ms polling).")
+        return True
+
+def probe_dwm_availability():
+    """Checks once whether DWM extended frame bounds can be queried, updating G_DWM_AVAILABLE."""
+    global G_DWM_AVAILABLE, G_DWM_STARTUP_AVAILABLE
+    G_DWM_AVAILABLE = True # Discards any failure seen before the probe (e.g. during an abandoned resume)
     try:
         test_rect = RECT()
         # Use a dummy window handle (0) for a basic DWM check
         hr = dwmapi.DwmGetWindowAttribute(0, DWMWA_EXTENDED_FRAME_BOUNDS, ctypes.byref(test_rect), ctypes.sizeof(test_rect))
         if hr != 0: # If it fails for a dummy window, assume DWM not fully available
             G_DWM_AVAILABLE = False
-            print("Warning: DWM API for extended frame bounds not fully available or failed to query. Window positioning might be less precise.")
+            log.warning("DWM API for extended frame bounds not fully available or failed to query. Window positioning might be less precise.")
     except Exception:
         G_DWM_AVAILABLE = False
-        print("Warning: dwmapi.DwmGetWindowAttribute call failed. Window positioning might be less precise.")
-
-
-    # Validate and set VALID_INTERNAL_CORNERS
-    valid_math_quads = [str(i) for i in range(1, 5)]
-    parsed_positions = []
-    for char in args.positions:
-        if char not in valid_math_quads:
-            print(f"Error: Invalid position '{char}' in --positions. Must be 1, 2, 3, or 4.")
-            sys.exit(1)
-        parsed_positions.append(MATH_QUAD_TO_INTERNAL_CORNER[char])
-    
-    VALID_INTERNAL_CORNERS = sorted(list(set(parsed_positions))) # Remove duplicates and sort for consistent cycling
-    if not VALID_INTERNAL_CORNERS:
-        print("Error: No valid positions specified for the window. Exiting.")
-        sys.exit(1)
-    
-    if NUM_WINDOWS_TO_CONTROL > len(VALID_INTERNAL_CORNERS):
-        print(f"Warning: You requested {NUM_WINDOWS_TO_CONTROL} windows but only {len(VALID_INTERNAL_CORNERS)} unique positions are allowed (--positions).")
-        print("This may lead to windows not being able to find a unique, non-overlapping spot.")
+        log.warning("dwmapi.DwmGetWindowAttribute call failed. Window positioning might be less precise.")
+    G_DWM_STARTUP_AVAILABLE = G_DWM_AVAILABLE
 
-
-    print(f"--- {__file__} ---") # Prints the script's filename
-    print(f"Config: Number of windows: {NUM_WINDOWS_TO_CONTROL}")
-    print(f"Config: Size {WINDOW_SCREEN_FRACTION*100:.0f}%, Gap {CORNER_GAP_PIXELS}px")
-    print(f"Animation: {ANIMATION_DURATION_SECONDS}s duration at {ANIMATION_FPS} FPS")
-    if NO_RESIZE:
-        print("Window resizing is DISABLED (--no-resize flag active).")
-    print(f"Dodging PAUSED if any window is maximized or covers >{SCREEN_COVERAGE_THRESHOLD*100:.0f}% of screen.")
-    
-    active_corners_names = [INTERNAL_CORNER_TO_MATH_QUAD_NAME[idx] for idx in VALID_INTERNAL_CORNERS]
-    print(f"Active Corners: {', '.join(active_corners_names)}")
-
-    print(f"\nIMPORTANT: LEFT-CLICK on {NUM_WINDOWS_TO_CONTROL} unique windows to control (not this console).")
+def select_windows_interactively():
+    """Installs the low-level mouse hook and collects clicked windows. Returns False if the hook failed."""
+    global g_hook_id
+    log.info(f"\nIMPORTANT: LEFT-CLICK on {NUM_WINDOWS_TO_CONTROL} unique windows to control (not this console).")
 
     h_instance = kernel32.GetModuleHandleW(None)
     g_hook_id = user32.SetWindowsHookExW(WH_MOUSE_LL, mouse_hook_proc, h_instance, 0)
     if not g_hook_id:
-        return print("Failed to install mouse hook. Ensure you have sufficient permissions (e.g., run as administrator). Exiting.")
+        log.error("Failed to install mouse hook. Ensure you have sufficient permissions (e.g., run as administrator). Exiting.")
+        return False
 
     msg = MSG()
     while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
@@ -598,28 +1111,55 @@ def main():
         user32.DispatchMessageW(ctypes.byref(msg))
 
     if g_hook_id: user32.UnhookWindowsHookEx(g_hook_id)
+    return True
 
-    if len(g_selected_hwnds) < NUM_WINDOWS_TO_CONTROL:
-        return print(f"Only {len(g_selected_hwnds)}/{NUM_WINDOWS_TO_CONTROL} windows selected. Exiting.")
-
-    full_screen_w, full_screen_h = get_full_screen_dimensions()
-    print(f"Detected full screen dimensions: {full_screen_w}x{full_screen_h} (Windows may apply display scaling)")
+def finish_window_placement(controlled_windows, window_numbers, require_rect=True):
+    """
+    Waits for the initial placement moves dispatched to the windows, HUNG_MOVE_GRACE_SECONDS at most.
+    A window whose move hasn't finished by then is quarantined (the dodge loop picks it up once it responds),
+    so one hung window can't hold up startup. The others get their actual visual rect; without one, a window
+    is dropped when `require_rect` is set. Returns the window states that stay controlled.
+    """
+    wait_for_window_workers(controlled_windows, time.perf_counter() + HUNG_MOVE_GRACE_SECONDS)
+    placed_windows = []
+    for window_state in controlled_windows:
+        number = window_numbers[window_state['hwnd']]
+        if is_window_busy(window_state):
+            quarantine_window(window_state, "initial move timed out")
+            window_state['current_visual_rect'] = None
+            placed_windows.append(window_state)
+            continue
+        poll_window_worker(window_state)
+        window_state['current_visual_rect'] = get_window_visual_rect(window_state['hwnd']) # Actual visual rect after the move
+        if not window_state['current_visual_rect'] and require_rect:
+            log.warning(f"Failed to get visual rect after initial move for window {number}. Skipping.")
+            continue
+        placed_windows.append(window_state)
+        log.info(f"Window {number} placed at {INTERNAL_CORNER_TO_MATH_QUAD_NAME[window_state['corner']]} and set to always on top.")
+    return placed_windows
 
+def initialize_windows(selected_hwnds, full_screen_w, full_screen_h):
+    """Sizes and places freshly selected windows in their initial corners. Returns their window states."""
     controlled_windows = [] # List to hold state for each controlled window
+    window_numbers = {} # hwnd -> 1-based selection number, for log messages
 
-    for i, hwnd in enumerate(g_selected_hwnds):
+    for i, hwnd in enumerate(selected_hwnds):
         if not user32.IsWindow(hwnd):
-            print(f"Warning: Selected window {i+1} (handle {hwnd}) is no longer valid. Skipping.")
+            log.warning(f"Selected window {i+1} (handle {hwnd}) is no longer valid. Skipping.")
+            continue
+
+        if not is_window_responsive(hwnd):
+            log.warning(f"Selected window {i+1} (handle {hwnd}) is not responding. Skipping.")
             continue
 
-        window_title, window_class = get_window_info(hwnd)
-        print(f"\n--- Initializing Window {i+1} ---")
-        print(f"Window handle: {hwnd}")
-        print(f"Window title: '{window_title}' (Class: '{window_class}')")
+        identity = get_window_identity(hwnd)
+        log.info(f"\n--- Initializing Window {i+1} ---")
+        log.info(f"Window handle: {hwnd}")
+        log.info(f"Window title: '{identity['title']}' (Class: '{identity['class']}', Process: '{identity['process']}')")
 
         initial_visual_rect = get_window_visual_rect(hwnd)
         if not initial_visual_rect:
-            print(f"Could not get initial visual dimensions for window {i+1}. Skipping.")
+            log.warning(f"Could not get initial visual dimensions for window {i+1}. Skipping.")
             continue
         
         initial_vis_w = initial_visual_rect.width()
@@ -627,7 +1167,7 @@ def main():
 
         min_size = 100
         if initial_vis_w <= 0 or initial_vis_h <= 0:
-            print("Warning: Original window has invalid (zero or negative) visual dimensions. Using default minimum.")
+            log.warning("Original window has invalid (zero or negative) visual dimensions. Using default minimum.")
             initial_vis_w = min_size
             initial_vis_h = min_size
             
@@ -656,7 +1196,7 @@ def main():
         max_allowed_vis_h = full_screen_h - 2 * CORNER_GAP_PIXELS
 
         if final_vis_w > max_allowed_vis_w or final_vis_h > max_allowed_vis_h:
-            print(f"Warning: Window visual size with current gap ({CORNER_GAP_PIXELS}px) exceeds full screen boundaries ({max_allowed_vis_w}x{max_allowed_vis_h}). Scaling down to fit.")
+            log.warning(f"Window visual size with current gap ({CORNER_GAP_PIXELS}px) exceeds full screen boundaries ({max_allowed_vis_w}x{max_allowed_vis_h}). Scaling down to fit.")
             
             # Recalculate aspect ratio from potentially scaled size to be safe
             # current_aspect_ratio_calc = final_vis_w / final_vis_h if final_vis_h > 0 else 1.0 # Not used for scaling
@@ -673,10 +1213,10 @@ def main():
             final_vis_h = max(final_vis_h, min_size)
 
         if final_vis_w <= 0 or final_vis_h <= 0:
-            print("Calculated final visual window dimensions are invalid. Skipping this window.")
+            log.warning("Calculated final visual window dimensions are invalid. Skipping this window.")
             continue
 
-        print(f"Final visual window dimensions: {final_vis_w}x{final_vis_h} with a {CORNER_GAP_PIXELS}px gap.")
+        log.info(f"Final visual window dimensions: {final_vis_w}x{final_vis_h} with a {CORNER_GAP_PIXELS}px gap.")
 
         # Get frame paddings (offsets between bounding box and visual content)
         # These are crucial for accurate positioning with SetWindowPos
@@ -689,7 +1229,7 @@ def main():
         # Check for overlap with already placed windows for initial placement
         potential_initial_visual_rect = RECT(target_vis_x, target_vis_y, target_vis_x + final_vis_w, target_vis_y + final_vis_h)
         if is_overlapping_any_other_window(potential_initial_visual_rect, controlled_windows, hwnd):
-            print(f"Initial corner {INTERNAL_CORNER_TO_MATH_QUAD_NAME[initial_corner_index]} overlaps with another window. Finding new initial spot...")
+            log.info(f"Initial corner {INTERNAL_CORNER_TO_MATH_QUAD_NAME[initial_corner_index]} overlaps with another window. Finding new initial spot...")
             found_initial_spot = False
             
             for try_offset in range(len(VALID_INTERNAL_CORNERS)):
@@ -702,30 +1242,597 @@ def main():
                     found_initial_spot = True
                     break
             if not found_initial_spot:
-                print(f"Could not find a unique initial non-overlapping spot for window {i+1}. Skipping this window.")
+                log.warning(f"Could not find a unique initial non-overlapping spot for window {i+1}. Skipping this window.")
                 continue
 
-        # Perform initial move and resize using calculated visual coordinates and frame paddings
-        move_window(hwnd, target_vis_x, target_vis_y, final_vis_w, final_vis_h, frame_paddings, animate=False, always_on_top=True)
-        
-        current_visual_rect_after_move = get_window_visual_rect(hwnd) # Get actual visual rect after move
-        
-        if not current_visual_rect_after_move:
-             print(f"Failed to get visual rect after initial move for window {i+1}. Skipping.")
-             continue
-
-        controlled_windows.append({
+        window_state = {
             'hwnd': hwnd,
             'corner': initial_corner_index,
-            'current_visual_rect': current_visual_rect_after_move,
+            'current_visual_rect': RECT(target_vis_x, target_vis_y, target_vis_x + final_vis_w, target_vis_y + final_vis_h), # Target until the move lands; later windows are placed around it
             'vis_w': final_vis_w,
             'vis_h': final_vis_h,
-            'frame_paddings': frame_paddings # Store paddings for future moves
-        })
-        print(f"Window {i+1} initialized at {INTERNAL_CORNER_TO_MATH_QUAD_NAME[initial_corner_index]} and set to always on top.")
+            'frame_paddings': frame_paddings, # Store paddings for future moves
+            'move_cost': None, # Rolling per-frame move cost in seconds, measured on first dodge
+            'identity': identity, # Used to re-attach to this window when resuming a session
+            'faded_since': None, # Set while the window is faded in --dodge-mode fade
+            'quarantined_since': None, # Set while the window is skipped for not responding
+            'last_quarantine_check': 0.0,
+            'worker': None, # Thread running the latest call dispatched to this window
+            'worker_action': None,
+            'worker_deadline': 0.0,
+            'worker_result': {},
+            'target_visual_rect': None, # Set while a dodge move is in flight
+            'dodge_cooldown_until': 0.0,
+            'too_large': False # Maximized or above the pause threshold, as of the last rect read
+        }
+        controlled_windows.append(window_state)
+        window_numbers[hwnd] = i + 1
+
+        # Perform initial move and resize using calculated visual coordinates and frame paddings
+        dispatch_window_call(window_state, 'place', HUNG_MOVE_GRACE_SECONDS, move_window,
+                             hwnd, target_vis_x, target_vis_y, final_vis_w, final_vis_h, frame_paddings, animate=False, always_on_top=True)
+
+    return finish_window_placement(controlled_windows, window_numbers)
+
+def get_session_config():
+    """Returns the configuration that determines window layout; a session only resumes if it matches."""
+    return {
+        'size': WINDOW_SCREEN_FRACTION,
+        'gap': CORNER_GAP_PIXELS,
+        'positions': VALID_INTERNAL_CORNERS,
+        'no_resize': NO_RESIZE,
+        'num_windows': NUM_WINDOWS_TO_CONTROL
+    }
+
+def get_session_snapshot(screen_size, all_windows_states):
+    """Returns the JSON-ready session: controlled windows, layout config, screen size and DWM availability."""
+    return {
+        'version': SESSION_VERSION,
+        'config': get_session_config(),
+        'screen': list(screen_size),
+        'dwm_available': G_DWM_STARTUP_AVAILABLE,
+        'windows': [{
+            **window_state['identity'],
+            'corner': window_state['corner'],
+            'vis_w': window_state['vis_w'],
+            'vis_h': window_state['vis_h'],
+            'frame_paddings': list(window_state['frame_paddings']),
+            'move_cost': window_state['move_cost'],
+            # Set while faded, so a window left faded by a crash can be restored on the next launch
+            'pre_fade_ex_style': window_state['original_ex_style'] if window_state['faded_since'] is not None else None
+        } for window_state in all_windows_states]
+    }
+
+def write_session_file(path, session):
+    """Writes a session snapshot to `path`, replacing the previous one atomically."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log.warning(f"Could not save session to {path}: {e}")
+
+class SessionWriter:
+    """
+    Saves the session on a background thread so file I/O never runs on the dodge loop.
+    The loop only takes an in-memory snapshot; only the newest one is written, and changes
+    within SESSION_SAVE_DELAY_SECONDS of each other are coalesced into a single write.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_forever, name="windodge-session-writer", daemon=True)
+        self._writer.start()
+
+    def save(self, screen_size, all_windows_states):
+        """Snapshots the session and marks it for writing."""
+        snapshot = get_session_snapshot(screen_size, all_windows_states)
+        with self._lock:
+            self._snapshot = snapshot
+        self._pending.set()
+
+    def close(self, timeout=1.0):
+        """Writes any pending snapshot and stops the writer, waiting at most `timeout` seconds."""
+        self._stop.set()
+        self._pending.set()
+        self._writer.join(timeout)
+
+    def _write_pending(self):
+        with self._lock:
+            snapshot, self._snapshot = self._snapshot, None
+        if snapshot is not None:
+            write_session_file(self.path, snapshot)
+
+    def _write_forever(self):
+        while not self._stop.is_set():
+            self._pending.wait()
+            self._stop.wait(SESSION_SAVE_DELAY_SECONDS) # Debounce, but don't delay exit
+            self._pending.clear()
+            self._write_pending()
+        self._write_pending() # Anything saved between the last write and close()
+
+def is_valid_session_window(saved_window):
+    """Checks that a saved window entry has every field resume_session needs, with usable values."""
+    if not isinstance(saved_window, dict): return False
+    if not all(isinstance(saved_window.get(key), str) for key in ('process', 'class', 'title')): return False
+    if saved_window.get('corner') not in VALID_INTERNAL_CORNERS: return False
+    vis_w, vis_h = saved_window.get('vis_w'), saved_window.get('vis_h')
+    if not (isinstance(vis_w, int) and isinstance(vis_h, int) and vis_w > 0 and vis_h > 0): return False
+    frame_paddings = saved_window.get('frame_paddings')
+    if not (isinstance(frame_paddings, list) and len(frame_paddings) == 4 and all(isinstance(pad, int) for pad in frame_paddings)): return False
+    move_cost = saved_window.get('move_cost')
+    if not (move_cost is None or (isinstance(move_cost, (int, float)) and move_cost >= 0)): return False
+    pre_fade_ex_style = saved_window.get('pre_fade_ex_style')
+    return pre_fade_ex_style is None or isinstance(pre_fade_ex_style, int)
+
+def load_session(path, screen_size):
+    """Returns the saved session if it exists, is well-formed and matches the current config and screen, else None."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(session, dict) or session.get('version') != SESSION_VERSION: return None
+    if session.get('config') != get_session_config() or session.get('screen') != list(screen_size): return None
+    if not isinstance(session.get('dwm_available'), bool): return None
+    windows = session.get('windows')
+    if not isinstance(windows, list) or not windows or len(windows) > NUM_WINDOWS_TO_CONTROL: return None
+    if not all(is_valid_session_window(saved_window) for saved_window in windows):
+        log.warning(f"Saved session {path} is malformed. Starting a new session.")
+        return None
+    return session
+
+def list_top_level_windows():
+    """Returns (hwnd, class_name) for every visible top-level window except this console."""
+    console_hwnd = kernel32.GetConsoleWindow()
+    windows = []
+
+    def collect(hwnd, lparam):
+        if hwnd != console_hwnd and user32.IsWindowVisible(hwnd):
+            c_buff = ctypes.create_unicode_buffer(256)
+            user32.GetClassNameW(hwnd, c_buff, 256)
+            windows.append((hwnd, c_buff.value if c_buff.value else "N/A"))
+        return True
+
+    user32.EnumWindows(WNDENUMPROC(collect), 0)
+    return windows
+
+def find_session_window(saved_window, candidates, taken_hwnds):
+    """
+    Finds the live window with exactly the saved process, class and title, or None.
+    Resuming moves and pins windows without asking, so a window that only looks similar
+    (another document of the same app) is never taken.
+    """
+    for hwnd, class_name in candidates:
+        if hwnd in taken_hwnds or class_name != saved_window['class']: continue
+        if get_window_process_name(hwnd) != saved_window['process']: continue
+        title, _ = get_window_info(hwnd)
+        if title == saved_window['title']: return hwnd
+    return None
+
+def restore_faded_session_windows(path):
+    """
+    Undoes fades left behind by a previous run that ended without restoring them (a crash or a kill).
+    Only needs the saved identities and pre-fade styles, so it runs whether or not the session is
+    resumed (other flags, another screen size, --no-resume). Restored entries are cleared in the file.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return
+    if not isinstance(session, dict) or session.get('version') != SESSION_VERSION: return
+    windows = session.get('windows')
+    if not isinstance(windows, list): return
+    faded_windows = [saved_window for saved_window in windows
+                     if isinstance(saved_window, dict) and isinstance(saved_window.get('pre_fade_ex_style'), int)
+                     and all(isinstance(saved_window.get(key), str) for key in ('process', 'class', 'title'))]
+    if not faded_windows: return
+
+    candidates = list_top_level_windows()
+    restores = []
+    for saved_window in faded_windows:
+        hwnd = find_session_window(saved_window, candidates, [])
+        if not hwnd:
+            log.info(f"Window '{saved_window['title']}' ({saved_window['process']}) left faded by the previous session is no longer open.")
+            continue
+        if not is_window_responsive(hwnd):
+            log.warning(f"Window '{saved_window['title']}' was left faded by the previous session but is not responding. It stays faded.")
+            continue
+        window_state = {'hwnd': hwnd, 'worker': None} # Only what dispatch_window_call needs
+        dispatch_window_call(window_state, 'unfade', WINDOW_CALL_TIMEOUT_SECONDS, user32.SetWindowLongW, hwnd, GWL_EXSTYLE, saved_window['pre_fade_ex_style'])
+        restores.append((saved_window, window_state))
+    if not restores: return
+
+    wait_for_window_workers([window_state for _, window_state in restores], time.perf_counter() + WINDOW_CALL_TIMEOUT_SECONDS)
+    restored = False
+    for saved_window, window_state in restores:
+        if is_window_busy(window_state):
+            log.warning(f"Window '{saved_window['title']}' stopped responding while being restored from a fade left by the previous session. It may stay faded.")
+            continue
+        saved_window['pre_fade_ex_style'] = None
+        restored = True
+        log.info(f"Restored window '{saved_window['title']}' from a fade left by the previous session.")
+    if restored:
+        write_session_file(path, session)
+
+def resume_session(path, full_screen_w, full_screen_h):
+    """
+    Re-attaches to the live windows of a saved session, reusing their saved corner, size and
+    frame paddings. Returns the window states, or None if any saved window can't be found.
+    """
+    global G_DWM_AVAILABLE, G_DWM_STARTUP_AVAILABLE
+    session = load_session(path, (full_screen_w, full_screen_h))
+    if not session: return None
+
+    candidates = list_top_level_windows()
+    matched_hwnds = []
+    for saved_window in session['windows']:
+        hwnd = find_session_window(saved_window, candidates, matched_hwnds)
+        if not hwnd:
+            log.warning(f"Saved window '{saved_window['title']}' ({saved_window['process']}) not found. Starting a new session.")
+            return None
+        matched_hwnds.append(hwnd)
+
+    # Check every window before moving any, so a failure never leaves some of them resized and topmost
+    for hwnd, saved_window in zip(matched_hwnds, session['windows']):
+        if not is_window_responsive(hwnd):
+            log.warning(f"Saved window '{saved_window['title']}' is not responding. Starting a new session.")
+            return None
+        if not get_window_visual_rect(hwnd):
+            log.warning(f"Could not get visual rect for saved window '{saved_window['title']}'. Starting a new session.")
+            return None
+
+    # Skip re-probing DWM, but only once the resume can no longer fail
+    G_DWM_AVAILABLE = G_DWM_STARTUP_AVAILABLE = session['dwm_available']
+    controlled_windows = []
+    window_numbers = {}
+    for i, (hwnd, saved_window) in enumerate(zip(matched_hwnds, session['windows'])):
+        vis_w, vis_h = saved_window['vis_w'], saved_window['vis_h']
+        frame_paddings = tuple(saved_window['frame_paddings'])
+        target_vis_x, target_vis_y = get_target_visual_coordinates(saved_window['corner'], full_screen_w, full_screen_h, vis_w, vis_h, CORNER_GAP_PIXELS)
+
+        window_state = {
+            'hwnd': hwnd,
+            'corner': saved_window['corner'],
+            'current_visual_rect': None, # Read once the move has landed
+            'vis_w': vis_w,
+            'vis_h': vis_h,
+            'frame_paddings': frame_paddings,
+            'move_cost': saved_window.get('move_cost'),
+            'identity': get_window_identity(hwnd),
+            'faded_since': None,
+            'quarantined_since': None,
+            'last_quarantine_check': 0.0,
+            'worker': None,
+            'worker_action': None,
+            'worker_deadline': 0.0,
+            'worker_result': {},
+            'target_visual_rect': None,
+            'dodge_cooldown_until': 0.0,
+            'too_large': False
+        }
+        controlled_windows.append(window_state)
+        window_numbers[hwnd] = i + 1
+        dispatch_window_call(window_state, 'place', HUNG_MOVE_GRACE_SECONDS, move_window,
+                             hwnd, target_vis_x, target_vis_y, vis_w, vis_h, frame_paddings, animate=False, always_on_top=True)
+        log.info(f"Resuming window {hwnd} ('{saved_window['title']}') at {INTERNAL_CORNER_TO_MATH_QUAD_NAME[saved_window['corner']]}.")
+    return finish_window_placement(controlled_windows, window_numbers, require_rect=False)
+
+# --- Main ---
+def main(power_state_source=get_system_power_state):
+    global WINDOW_SCREEN_FRACTION, CORNER_GAP_PIXELS, ANIMATION_FPS, ANIMATION_MIN_FPS, ANIMATION_MAX_FPS, ADAPTIVE_ANIMATION, VALID_INTERNAL_CORNERS, NO_RESIZE, NUM_WINDOWS_TO_CONTROL, SCREEN_COVERAGE_THRESHOLD, HOVER_MARGIN_PIXELS
+    global DODGE_MODE, FADE_OPACITY, FADE_LINGER_SECONDS, POWER_AWARE, g_base_animation_fps
+    global g_selected_hwnds
+    launch_time = time.perf_counter()
+
+    parser = argparse.ArgumentParser(
+        description="windodge.py: Makes selected Windows dodge your mouse with smooth animation. Supports up to 4 windows, preventing overlap. Pauses if a window is maximized or too large. Allows windows to overlap taskbar.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--size',
+        type=float,
+        default=WINDOW_SCREEN_FRACTION,
+        help=(
+            f"Window size as a fraction of screen width/height (e.g., 0.25 for 25%%).\n"
+            f"Aspect ratio of the original window will be preserved.\n"
+            f"This parameter is ignored if --no-resize is used.\n"
+            f"Default: {WINDOW_SCREEN_FRACTION}"
+        )
+    )
+    parser.add_argument(
+        '--fps',
+        type=int,
+        default=ANIMATION_FPS,
+        help=(
+            f"Animation frames per second (higher = smoother, more CPU).\n"
+            f"Used until a window's move cost has been measured, or always with --fixed-fps.\n"
+            f"Default: {ANIMATION_FPS}"
+        )
+    )
+    parser.add_argument(
+        '--min-fps',
+        type=int,
+        default=ANIMATION_MIN_FPS,
+        help=(
+            f"Lowest adaptive frame rate for windows that are slow to move (browsers, video players).\n"
+            f"Windows that cannot keep up even at this rate move instantly instead.\n"
+            f"Default: {ANIMATION_MIN_FPS}"
+        )
+    )
+    parser.add_argument(
+        '--max-fps',
+        type=int,
+        default=ANIMATION_MAX_FPS,
+        help=f"Highest adaptive frame rate for windows that are cheap to move.\nDefault: {ANIMATION_MAX_FPS}"
+    )
+    parser.add_argument(
+        '--fixed-fps',
+        action='store_true',
+        help="Disable per-window adaptive animation; always animate at --fps."
+    )
+    parser.add_argument(
+        '--gap',
+        type=int,
+        default=CORNER_GAP_PIXELS,
+        help=f"Pixel gap between window and screen borders.\nDefault: {CORNER_GAP_PIXELS}"
+    )
+    parser.add_argument(
+        '--positions',
+        type=str,
+        default="1234",
+        help=(
+            "Which corners the window can move to. Specify as a string of numbers 1-4 (no spaces).\n"
+            "   1: Top-Right (Math Q1)\n"
+            "   2: Top-Left (Math Q2)\n"
+            "   3: Bottom-Left (Math Q3)\n"
+            "   4: Bottom-Right (Math Q4)\n"
+            "Example: '12' for Top-Left and Top-Right only.\n"
+            "Default: '1234' (all corners)"
+        )
+    )
+    parser.add_argument(
+        '--no-resize', '-N',
+        action='store_true',
+        help="Do not resize the selected window; only move it. Ignores --size parameter."
+    )
+    parser.add_argument(
+        '--num-windows', '-n',
+        type=int,
+        default=NUM_WINDOWS_TO_CONTROL,
+        choices=range(1, 5), # Limit to 1 to 4 windows
+        help=f"Number of windows to control (1-4). You will click each window to select it.\nDefault: {NUM_WINDOWS_TO_CONTROL}"
+    )
+    parser.add_argument(
+        '--pause-threshold',
+        type=float,
+        default=SCREEN_COVERAGE_THRESHOLD,
+        help=(
+            f"Percentage of screen area (0.0 to 1.0) a window can cover before pausing dodging.\n"
+            f"Also pauses if window is maximized. Default: {SCREEN_COVERAGE_THRESHOLD}"
+        )
+    )
+    parser.add_argument(
+        '--hover-margin',
+        type=int,
+        default=HOVER_MARGIN_PIXELS,
+        help=(
+            f"Extra pixels around each window that also trigger a dodge when the mouse enters them.\n"
+            f"Default: {HOVER_MARGIN_PIXELS}"
+        )
+    )
+    parser.add_argument(
+        '--dodge-mode',
+        type=str,
+        default=DODGE_MODE,
+        choices=['move', 'fade'],
+        help=(
+            "How a window gets out of the mouse's way.\n"
+            "   move: animate the window to another corner\n"
+            "   fade: make the window translucent and click-through until the mouse leaves\n"
+            f"Default: {DODGE_MODE}"
+        )
+    )
+    parser.add_argument(
+        '--fade-opacity',
+        type=float,
+        default=FADE_OPACITY,
+        help=f"Opacity (0.0 to 1.0) of a faded window in --dodge-mode fade.\nDefault: {FADE_OPACITY}"
+    )
+    parser.add_argument(
+        '--fade-linger',
+        type=float,
+        default=FADE_LINGER_SECONDS,
+        help=(
+            f"In --dodge-mode fade, move the window to another corner anyway if the mouse\n"
+            f"stays over it for this many seconds. 0 disables the fallback.\n"
+            f"Default: {FADE_LINGER_SECONDS}"
+        )
+    )
+    parser.add_argument(
+        '--power-aware',
+        action='store_true',
+        help=(
+            "Switch to lighter profiles while on battery or with battery saver on:\n"
+            "lower animation FPS, slower polling and no per-tick always-on-top reassertion.\n"
+            "The power state is re-checked at runtime."
+        )
+    )
+    parser.add_argument(
+        '--battery-fps',
+        type=int,
+        default=POWER_PROFILES['battery']['max_fps'],
+        help=f"Maximum animation FPS on battery with --power-aware.\nDefault: {POWER_PROFILES['battery']['max_fps']}"
+    )
+    parser.add_argument(
+        '--battery-poll',
+        type=float,
+        default=POWER_PROFILES['battery']['poll_interval'],
+        help=f"Seconds between mouse checks on battery with --power-aware.\nDefault: {POWER_PROFILES['battery']['poll_interval']}"
+    )
+    parser.add_argument(
+        '--quiet', '-q',
+        action='store_true',
+        help="Only show warnings and errors."
+    )
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help="Also show debug messages (e.g. every time the mouse enters a window)."
+    )
+    parser.add_argument(
+        '--log-file',
+        type=str,
+        default=None,
+        help="Also append log messages, with timestamps, to this file."
+    )
+    parser.add_argument(
+        '--session-file',
+        type=str,
+        default=SESSION_FILE,
+        help=(
+            f"Where the current session (controlled windows and layout) is saved.\n"
+            f"On startup, matching live windows from this session are re-attached automatically.\n"
+            f"Default: {SESSION_FILE.replace('%', '%%')}"
+        )
+    )
+    parser.add_argument(
+        '--no-resume',
+        action='store_true',
+        help="Ignore any saved session and select windows by clicking."
+    )
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        log.level = LOG_DEBUG
+    elif args.quiet:
+        log.level = LOG_WARNING
+    try:
+        log.start(args.log_file)
+    except OSError as e:
+        log.start()
+        log.warning(f"Could not open log file {args.log_file}: {e}")
+
+    # Apply arguments to global configuration
+    WINDOW_SCREEN_FRACTION = args.size
+    ANIMATION_FPS = args.fps
+    ANIMATION_MIN_FPS = max(args.min_fps, 1)
+    ANIMATION_MAX_FPS = max(args.max_fps, ANIMATION_MIN_FPS)
+    ADAPTIVE_ANIMATION = not args.fixed_fps
+    CORNER_GAP_PIXELS = args.gap
+    NO_RESIZE = args.no_resize
+    NUM_WINDOWS_TO_CONTROL = args.num_windows
+    SCREEN_COVERAGE_THRESHOLD = args.pause_threshold
+    HOVER_MARGIN_PIXELS = max(args.hover_margin, 0)
+    DODGE_MODE = args.dodge_mode
+    POWER_AWARE = args.power_aware
+    POWER_PROFILES['battery']['max_fps'] = max(args.battery_fps, 1)
+    POWER_PROFILES['battery']['poll_interval'] = max(args.battery_poll, 0.001)
+    # Battery saver is never allowed to be heavier than the plain battery profile
+    POWER_PROFILES['saver']['max_fps'] = min(POWER_PROFILES['saver']['max_fps'], POWER_PROFILES['battery']['max_fps'])
+    POWER_PROFILES['saver']['poll_interval'] = max(POWER_PROFILES['saver']['poll_interval'], POWER_PROFILES['battery']['poll_interval'])
+    FADE_OPACITY = min(max(args.fade_opacity, 0.0), 1.0)
+    FADE_LINGER_SECONDS = max(args.fade_linger, 0.0)
+
+    g_base_animation_fps = (ANIMATION_FPS, ANIMATION_MIN_FPS, ANIMATION_MAX_FPS)
+
+    # Validate and set VALID_INTERNAL_CORNERS
+    valid_math_quads = [str(i) for i in range(1, 5)]
+    parsed_positions = []
+    for char in args.positions:
+        if char not in valid_math_quads:
+            log.error(f"Invalid position '{char}' in --positions. Must be 1, 2, 3, or 4.")
+            sys.exit(1)
+        parsed_positions.append(MATH_QUAD_TO_INTERNAL_CORNER[char])
+    
+    VALID_INTERNAL_CORNERS = sorted(list(set(parsed_positions))) # Remove duplicates and sort for consistent cycling
+    if not VALID_INTERNAL_CORNERS:
+        log.error("No valid positions specified for the window. Exiting.")
+        sys.exit(1)
+    
+    if NUM_WINDOWS_TO_CONTROL > len(VALID_INTERNAL_CORNERS):
+        log.warning(f"You requested {NUM_WINDOWS_TO_CONTROL} windows but only {len(VALID_INTERNAL_CORNERS)} unique positions are allowed (--positions).")
+        log.warning("This may lead to windows not being able to find a unique, non-overlapping spot.")
+
+
+    log.info(f"--- {__file__} ---") # Prints the script's filename
+    log.info(f"Config: Number of windows: {NUM_WINDOWS_TO_CONTROL}")
+    log.info(f"Config: Size {WINDOW_SCREEN_FRACTION*100:.0f}%, Gap {CORNER_GAP_PIXELS}px, Hover margin {HOVER_MARGIN_PIXELS}px")
+    if ADAPTIVE_ANIMATION:
+        log.info(f"Animation: {ANIMATION_DURATION_SECONDS}s duration, adaptive {ANIMATION_MIN_FPS}-{ANIMATION_MAX_FPS} FPS (starting at {ANIMATION_FPS} FPS)")
+    else:
+        log.info(f"Animation: {ANIMATION_DURATION_SECONDS}s duration at {ANIMATION_FPS} FPS")
+    if NO_RESIZE:
+        log.info("Window resizing is DISABLED (--no-resize flag active).")
+    if DODGE_MODE == 'fade':
+        linger_note = f", moving after {FADE_LINGER_SECONDS}s" if FADE_LINGER_SECONDS else ""
+        log.info(f"Dodge mode: fade to {FADE_OPACITY*100:.0f}% opacity and click-through{linger_note}")
+    if POWER_AWARE:
+        battery_profile = POWER_PROFILES['battery']
+        log.info(f"Power-aware: on battery, max {battery_profile['max_fps']} FPS and {battery_profile['poll_interval']*1000:.0f}ms polling")
+    log.info(f"Dodging PAUSED if any window is maximized or covers >{SCREEN_COVERAGE_THRESHOLD*100:.0f}% of screen.")
+    
+    active_corners_names = [INTERNAL_CORNER_TO_MATH_QUAD_NAME[idx] for idx in VALID_INTERNAL_CORNERS]
+    log.info(f"Active Corners: {', '.join(active_corners_names)}")
+
+    full_screen_w, full_screen_h = get_full_screen_dimensions()
+    log.info(f"Detected full screen dimensions: {full_screen_w}x{full_screen_h} (Windows may apply display scaling)")
+
+    # Runs before resume or selection: a window left faded is click-through and couldn't even be clicked
+    restore_faded_session_windows(args.session_file)
+
+    controlled_windows = None
+    if not args.no_resume:
+        controlled_windows = resume_session(args.session_file, full_screen_w, full_screen_h)
+    resumed = bool(controlled_windows)
+
+    if not resumed:
+        probe_dwm_availability()
+        if not select_windows_interactively(): return
+
+        if len(g_selected_hwnds) < NUM_WINDOWS_TO_CONTROL:
+            return log.error(f"Only {len(g_selected_hwnds)}/{NUM_WINDOWS_TO_CONTROL} windows selected. Exiting.")
+
+        controlled_windows = initialize_windows(g_selected_hwnds, full_screen_w, full_screen_h)
 
     if not controlled_windows:
-        return print("No valid windows to control. Exiting.")
+        return log.error("No valid windows to control. Exiting.")
+
+    session_writer = SessionWriter(args.session_file)
+    session_writer.save((full_screen_w, full_screen_h), controlled_windows)
+
+    stop_requested = threading.Event() # Set by the console close handler; the dodge loop exits at its next tick
+    loop_stopped = threading.Event()
+    released = threading.Event()
+    shut_down_lock = threading.Lock()
+
+    def shut_down():
+        with shut_down_lock: # The console close handler and the main thread can both get here
+            if released.is_set(): return
+            release_windows(controlled_windows)
+            if g_quarantine_events:
+                log.info(f"Unresponsive windows were quarantined {g_quarantine_events} times this session.")
+            session_writer.save((full_screen_w, full_screen_h), controlled_windows) # Records which windows are no longer faded
+            session_writer.close()
+            released.set()
+
+    def shut_down_on_console_close():
+        # Runs on a system thread. Stop the dodge loop first so it can't fade or move a window after it was restored.
+        stop_requested.set()
+        if not loop_stopped.wait(LOOP_STOP_TIMEOUT_SECONDS):
+            log.warning("Dodge loop did not stop in time. Restoring windows anyway.")
+        shut_down()
+        log.close() # The process is killed as soon as the handler returns
+
+    install_console_close_handler(shut_down_on_console_close)
+    log.info(f"Dodging active {(time.perf_counter() - launch_time) * 1000:.0f} ms after launch ({'resumed session' if resumed else 'new session'}).")
 
     # Minimize console window if controlling multiple or if not in --no-resize (where it might be in the way)
     # The console window will also be DPI aware now.
@@ -734,88 +1841,131 @@ def main():
         if console_hwnd:
             user32.ShowWindow(console_hwnd, SW_MINIMIZE)
 
+    geometry_watcher = GeometryWatcher([window_state['hwnd'] for window_state in controlled_windows])
     try:
         paused_state = False
-        while True:
+        hit_index = build_danger_zone_index(controlled_windows, HOVER_MARGIN_PIXELS)
+        power_monitor = PowerProfileMonitor(power_state_source if POWER_AWARE else None)
+        while not stop_requested.is_set():
+            power_monitor.poll()
+            power_profile = power_monitor.profile
+
             # Remove any controlled windows that have been closed
-            controlled_windows[:] = [win for win in controlled_windows if user32.IsWindow(win['hwnd'])]
+            open_windows = [win for win in controlled_windows if user32.IsWindow(win['hwnd'])]
+            if len(open_windows) != len(controlled_windows):
+                controlled_windows[:] = open_windows
+                session_writer.save((full_screen_w, full_screen_h), controlled_windows)
             if not controlled_windows:
-                print("All controlled windows have been closed. Exiting.")
+                log.info("All controlled windows have been closed. Exiting.")
                 break
 
-            # Check if any window is in a "too large" state
+            # Collect finished window calls, quarantining the ones past their deadline
+            session_changed = False
+            for window_state in controlled_windows:
+                if poll_window_worker(window_state) in ('move', 'unfade'): session_changed = True
+                if window_state['quarantined_since'] is not None:
+                    check_quarantine(window_state)
+
+            # Refresh geometry of windows that moved or resized, and check if any window is in a "too large" state
+            changed_hwnds = geometry_watcher.take_changed()
             any_window_large = False
             for window_state in controlled_windows:
                 hwnd = window_state['hwnd']
-                # Always re-affirm always-on-top for all windows, even if paused
-                user32.SetWindowPos(hwnd, HWND_TOPMOST, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE | SWP_ASYNCWINDOWPOS)
-
-                if is_window_too_large(hwnd, full_screen_w, full_screen_h, SCREEN_COVERAGE_THRESHOLD):
+                # Re-affirm always-on-top for all windows, even if paused (skipped by lighter power profiles)
+                if power_profile['reassert_topmost']:
+                    user32.SetWindowPos(hwnd, HWND_TOPMOST, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE | SWP_ASYNCWINDOWPOS)
+
+                if hwnd in changed_hwnds or window_state['current_visual_rect'] is None:
+                    current_visual_rect = get_window_visual_rect(hwnd)
+                    if not current_visual_rect:
+                        if window_state['current_visual_rect'] is not None: # Logged once, not on every retry
+                            log.warning(f"Could not get visual rectangle for {hwnd}, assuming it's closing.")
+                        window_state['current_visual_rect'] = None # Drops the window from the hit-test index until a fresh rect is read
+                        window_state['too_large'] = False
+                        continue
+                    window_state['current_visual_rect'] = current_visual_rect # Update rect in state
+                    window_state['too_large'] = is_window_too_large(hwnd, full_screen_w, full_screen_h, SCREEN_COVERAGE_THRESHOLD, current_visual_rect)
+
+                if window_state['too_large']:
                     any_window_large = True
             
             if any_window_large:
                 if not paused_state:
-                    print("\n--- Script Paused: A controlled window is maximized or covers >90% of screen. ---")
+                    for window_state in controlled_windows:
+                        if window_state['faded_since'] is None or window_state['quarantined_since'] is not None: continue
+                        if is_window_busy(window_state): continue
+                        if not unfade_window(window_state):
+                            quarantine_window(window_state, "restoring from fade")
+                    session_writer.save((full_screen_w, full_screen_h), controlled_windows)
+                    log.info("\n--- Script Paused: A controlled window is maximized or covers >90% of screen. ---")
                     paused_state = True
-                time.sleep(0.5) # Longer sleep during pause when paused
+                elif session_changed:
+                    session_writer.save((full_screen_w, full_screen_h), controlled_windows)
+                stop_requested.wait(power_profile['pause_interval']) # Longer sleep during pause when paused
                 continue # Skip dodging logic
             
             # If not paused, or just resumed
             if paused_state:
-                print("--- Script Resumed: All controlled windows are now within normal bounds. ---")
+                log.info("--- Script Resumed: All controlled windows are now within normal bounds. ---")
                 paused_state = False
 
+            # Only rebuild the hit-test grid when some window actually changed geometry
+            if get_windows_geometry(controlled_windows) != hit_index['geometry']:
+                hit_index = build_danger_zone_index(controlled_windows, HOVER_MARGIN_PIXELS)
+
             # --- Normal Dodging Logic (only executed if not paused) ---
-            for window_state in controlled_windows:
+            mouse_pos = POINT()
+            if not user32.GetCursorPos(ctypes.byref(mouse_pos)):
+                stop_requested.wait(power_profile['poll_interval'])
+                continue
+
+            hit_windows = hit_test_danger_zones(hit_index, mouse_pos.x, mouse_pos.y)
+
+            if DODGE_MODE == 'fade':
+                # Restore faded windows once the cursor has left their danger zone
+                hit_hwnds = {window_state['hwnd'] for window_state in hit_windows}
+                for window_state in controlled_windows:
+                    if window_state['faded_since'] is None or window_state['quarantined_since'] is not None: continue
+                    if window_state['hwnd'] in hit_hwnds or is_window_busy(window_state): continue
+                    if not unfade_window(window_state):
+                        quarantine_window(window_state, "restoring from fade")
+
+            for window_state in hit_windows:
                 hwnd = window_state['hwnd']
-                mouse_pos = POINT()
-                user32.GetCursorPos(ctypes.byref(mouse_pos))
-
-                current_visual_rect = get_window_visual_rect(hwnd)
-                if not current_visual_rect:
-                    print(f"Could not get visual rectangle for {hwnd}, assuming it's closing.")
-                    continue 
-
-                window_state['current_visual_rect'] = current_visual_rect # Update rect in state
-
-                if is_mouse_in_window(hwnd, current_visual_rect):
-                    # print(f"Mouse entered window {hwnd}! Dodging directionally...")
-                    
-                    ideal_corner_index = get_ideal_directional_corner(window_state['corner'], mouse_pos.x, mouse_pos.y, current_visual_rect)
-                    
-                    # Find a safe target corner (non-overlapping and allowed)
-                    target_corner_index = get_safe_target_corner(
-                        window_state['corner'],
-                        ideal_corner_index,
-                        controlled_windows,
-                        hwnd,
-                        full_screen_w, full_screen_h,
-                        window_state['vis_w'],
-                        window_state['vis_h'],
-                        CORNER_GAP_PIXELS
-                    )
-                    
-                    if target_corner_index != window_state['corner']:
-                        print(f"Window {hwnd} moving from {INTERNAL_CORNER_TO_MATH_QUAD_NAME[window_state['corner']]} to {INTERNAL_CORNER_TO_MATH_QUAD_NAME[target_corner_index]}.")
-                        window_state['corner'] = target_corner_index
-
-                        target_vis_x, target_vis_y = get_target_visual_coordinates(target_corner_index, full_screen_w, full_screen_h, window_state['vis_w'], window_state['vis_h'], CORNER_GAP_PIXELS)
-                        
-                        move_window(hwnd, target_vis_x, target_vis_y, window_state['vis_w'], window_state['vis_h'], window_state['frame_paddings'], animate=True, always_on_top=True)
-                        
-                        # Update the window's visual rect after smooth move
-                        window_state['current_visual_rect'] = get_window_visual_rect(hwnd) 
-                        time.sleep(0.2) # Cooldown after dodge to prevent rapid re-trigger
-            time.sleep(0.02) # Check frequently for responsiveness
+                # Visibility is only checked on a hit, keeping it out of the per-tick work
+                if not user32.IsWindowVisible(hwnd): continue
+                if window_state['quarantined_since'] is not None: continue # Quarantined earlier in this tick
+                if is_window_busy(window_state): continue # Still moving or changing style
+                if time.perf_counter() < window_state['dodge_cooldown_until']: continue # Prevents rapid re-trigger
+
+                if DODGE_MODE == 'fade' and (window_state['faded_since'] is not None or can_fade_window(hwnd)):
+                    if window_state['faded_since'] is None:
+                        log.debug(f"Mouse entered window {hwnd}! Fading...")
+                        if not fade_window(window_state):
+                            quarantine_window(window_state, "before fade")
+                        session_changed = True
+                        continue
+                    if not FADE_LINGER_SECONDS or time.perf_counter() - window_state['faded_since'] < FADE_LINGER_SECONDS:
+                        continue
+                    # Cursor lingered: fall back to moving out of the way (the move restores the window first)
+
+                log.debug(f"Mouse entered window {hwnd}! Dodging directionally...")
+                if dodge_to_safe_corner(window_state, mouse_pos.x, mouse_pos.y, controlled_windows, full_screen_w, full_screen_h):
+                    session_changed = True
+            if session_changed:
+                session_writer.save((full_screen_w, full_screen_h), controlled_windows)
+            stop_requested.wait(power_profile['poll_interval']) # Check frequently for responsiveness
     except KeyboardInterrupt:
-        print("\nScript terminated by user.")
+        log.info("\nScript terminated by user.")
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        log.error(f"An unexpected error occurred: {e}")
     finally:
-        for window_state in controlled_windows:
-            if user32.IsWindow(window_state['hwnd']):
-                user32.SetWindowPos(window_state['hwnd'], HWND_NOTOPMOST, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE | SWP_SHOWWINDOW)
-                print(f"Always on top status removed from window {window_state['hwnd']}.")
+        geometry_watcher.close()
+        loop_stopped.set()
+        shut_down()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        log.close()
\ No newline at end of file